@@ -1,34 +1,38 @@
-import json
+import os
+import sys
 import pandas as pd
 from collections import defaultdict
 
-# Load the JSON file
-file_path = "solutions.json"  # Adjust this path based on your local directory
-with open(file_path, "r") as f:
-    data = json.load(f)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import solutions_store
+
+# Stream the solution records from the JSON file or a solutions store
+file_path = sys.argv[1] if len(sys.argv) > 1 else "solutions.json"  # Adjust this path based on your local directory
+if solutions_store.is_store(file_path):
+    records = solutions_store.iter_records(file_path)
+else:
+    records = solutions_store.iter_file_records(file_path)
 
 # Initialize a dictionary to store the structured results
 structured_results = defaultdict(lambda: defaultdict(lambda: {"total": 0, "pass": 0, "syntax_error": 0, "functional_error": 0}))
 
 # Process the data to count various results per LLM and type
-for llm, categories in data.items():
-    for category, modules in categories.items():
-        for module in modules:
-            for solution in module.get("solutions", []):
-                structured_results[category][llm]["total"] += 1
-
-                pass_info = solution.get("pass", "")
-                if pass_info == "true":
-                    structured_results[category][llm]["pass"] += 1
-                elif "Detected error while running simulation" in pass_info:
-                    structured_results[category][llm]["syntax_error"] += 1
-
-                # Functional error count
-                structured_results[category][llm]["functional_error"] = (
-                    structured_results[category][llm]["total"]
-                    - structured_results[category][llm]["syntax_error"]
-                    - structured_results[category][llm]["pass"]
-                )
+for record in records:
+    llm, category, solution = record["model"], record["category"], record["entry"]
+    structured_results[category][llm]["total"] += 1
+
+    pass_info = solution.get("pass", "")
+    if pass_info == "true":
+        structured_results[category][llm]["pass"] += 1
+    elif "Detected error while running simulation" in pass_info:
+        structured_results[category][llm]["syntax_error"] += 1
+
+    # Functional error count
+    structured_results[category][llm]["functional_error"] = (
+        structured_results[category][llm]["total"]
+        - structured_results[category][llm]["syntax_error"]
+        - structured_results[category][llm]["pass"]
+    )
 
 # Create a DataFrame from the structured results
 df_restructured = pd.DataFrame.from_dict(
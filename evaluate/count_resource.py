@@ -1,25 +1,29 @@
-import json
+import os
+import sys
 import pandas as pd
 from collections import defaultdict
 
-# Load the JSON file
-file_path = "solutions.json"
-with open(file_path, "r") as f:
-    data = json.load(f)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import solutions_store
+
+# Stream the solution records from the JSON file or a solutions store
+file_path = sys.argv[1] if len(sys.argv) > 1 else "solutions.json"
+if solutions_store.is_store(file_path):
+    records = solutions_store.iter_records(file_path)
+else:
+    records = solutions_store.iter_file_records(file_path)
 
 # Initialize a dictionary to store the minimal LUT usage for each module and LLM
 lut_results = defaultdict(lambda: defaultdict(lambda: float("inf")))
 
 # Process the data to extract the minimum LUT usage per module per LLM
-for llm, categories in data.items():
-    for category, modules in categories.items():
-        for module_data in modules:
-            module_name = module_data["module"].replace("_", " ")  # Replace underscores with spaces
-            for solution in module_data.get("solutions", []):
-                if "resource usage" in solution and "optimized" in solution["resource usage"]:
-                    lut_count = solution["resource usage"]["optimized"].get("LUT", float("inf"))
-                    # Store the minimum LUT usage
-                    lut_results[module_name][llm] = min(lut_results[module_name][llm], lut_count)
+for record in records:
+    llm, solution = record["model"], record["entry"]
+    module_name = record["module"].replace("_", " ")  # Replace underscores with spaces
+    if "resource usage" in solution and "optimized" in solution["resource usage"]:
+        lut_count = solution["resource usage"]["optimized"].get("LUT", float("inf"))
+        # Store the minimum LUT usage
+        lut_results[module_name][llm] = min(lut_results[module_name][llm], lut_count)
 
 # Convert the dictionary into a DataFrame
 df_lut = pd.DataFrame.from_dict(lut_results, orient="index")
@@ -1,9 +1,14 @@
-import json
+import math
+import os
 import matplotlib.pyplot as plt
 import re
+import sys
 import seaborn as sns
 import pandas as pd
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import solutions_store
+
 # --- Utility Functions ---
 
 def compute_module_pass(solution_list, k):
@@ -17,6 +22,23 @@ def compute_module_pass(solution_list, k):
             return 1
     return 0
 
+def estimate_module_pass(module, k):
+    """
+    Estimate pass@k for a module sampled in adaptive mode (it has an "adaptive" record).
+    With n drawn samples and c passes, use the unbiased estimator 1 - C(n-c, k) / C(n, k)
+    when n >= k. When samples were skipped (n < k), use 1 - (1 - c/n)^k instead.
+    """
+    samples = [module["solutions"][position] for position in module["adaptive"]["samples"]]
+    n = len(samples)
+    if n == 0:
+        return 0
+    c = sum(1 for sol in samples if sol.get("pass", "").strip().lower() == "true")
+    if n < k:
+        return 1 - (1 - c / n) ** k
+    if n - c < k:
+        return 1
+    return 1 - math.comb(n - c, k) / math.comb(n, k)
+
 def compute_pass_at_k_for_modules(modules, k):
     """
     Given a list of modules (each module is expected to have a "solutions" list),
@@ -25,7 +47,8 @@ def compute_pass_at_k_for_modules(modules, k):
     total = len(modules)
     if total == 0:
         return 0
-    passed = sum(compute_module_pass(mod["solutions"], k) for mod in modules)
+    passed = sum(estimate_module_pass(mod, k) if "adaptive" in mod else compute_module_pass(mod["solutions"], k)
+                 for mod in modules)
     return passed / total
 
 def compute_overall_pass_at_k(llm_data, ks):
@@ -60,14 +83,17 @@ def compute_category_pass_at_k(llm_data, ks):
 # Choose the k values you want to evaluate pass@k for:
 ks = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
 
-# Load the JSON file.
-input_json_file = "solutions.json"  # adjust filename if necessary
-with open(input_json_file, "r") as f:
-    data = json.load(f)
+# Load the JSON file, or one model at a time from a solutions store.
+input_json_file = sys.argv[1] if len(sys.argv) > 1 else "solutions.json"  # adjust filename if necessary
+if solutions_store.is_store(input_json_file):
+    llm_slices = ((model, solutions_store.load_solutions(input_json_file, model)[model])
+                  for model in solutions_store.list_models(input_json_file))
+else:
+    llm_slices = solutions_store.load_solutions(input_json_file).items()
 
 # We'll store our computed pass@k results per LLM in a dictionary.
 llm_results = {}
-for llm, llm_data in data.items():
+for llm, llm_data in llm_slices:
     overall = compute_overall_pass_at_k(llm_data, ks)
     categories = compute_category_pass_at_k(llm_data, ks)
     llm_results[llm] = {
@@ -2,6 +2,7 @@ import json
 import os
 import re
 import subprocess
+import solutions_store
 
 # File paths
 SOLUTIONS_FILE = "solutions.json"
@@ -10,7 +11,7 @@ TEMP_VERILOG_FILE = "temp.v"
 TEMP_TESTBENCH_FILE = "testbench.v"
 TCL_SCRIPT_FILE = "run_testbench.tcl"
 
-def write_tcl():
+def write_tcl(top_module):
         # Generate the TCL script for Vivado
     tcl_commands = f"""
     create_project temp_project ./temp_project -force -part xc7z020clg400-1
@@ -39,15 +40,52 @@ def extract_top_module_name(testbench_file):
 
 
 
-def run_functional_correctness():
-    # Load JSON files
-    with open(SOLUTIONS_FILE, "r", encoding="utf-8") as file:
-        solutions_data = json.load(file)
+def test_solution(verilog_code, testbench_code, module_name, vivado_path):
+    """
+    Simulates one Verilog solution against its testbench with Vivado.
+    Returns the value stored in the solution's "pass" field: "true" on success,
+    otherwise the error log.
+    """
+    # Write the Verilog design to a file
+    with open(TEMP_VERILOG_FILE, "w", encoding="utf-8") as f:
+        f.write(verilog_code)
 
-    with open(PROBLEMS_FILE, "r", encoding="utf-8") as file:
-        problems_data = json.load(file)
+    # Write the testbench to a file
+    with open(TEMP_TESTBENCH_FILE, "w", encoding="utf-8") as f:
+        f.write(testbench_code)
 
-    # Map module names to their testbenches
+    # Extract the top module name
+    top_module = extract_top_module_name(TEMP_TESTBENCH_FILE)
+    if not top_module:
+        print(f"Error: Could not extract top module from {module_name}. Skipping...")
+        return "Error: Could not extract top module."
+
+    print(f"Testing module: {module_name} (Top Module: {top_module})")
+
+    write_tcl(top_module)
+
+    # Run Vivado in batch mode
+    print(f"Running Vivado simulation for {module_name}...")
+    process = subprocess.run([vivado_path, "-mode", "batch", "-source", TCL_SCRIPT_FILE], capture_output=True, text=True)
+
+    # Capture output logs
+    output_log = process.stdout + "\n" + process.stderr
+    print(output_log)
+    test_passed = "All tests passed" in output_log
+
+    print(f"Test result for {module_name}: {'PASS' if test_passed else 'FAIL'}")
+
+    # Determine pass/fail status
+    if test_passed:
+        return "true"
+    # Extract relevant error messages
+    error_lines = "\n".join(line for line in output_log.split("\n") if "error" or "fail" in line.lower())
+    return error_lines if error_lines else "Test failed somehow"
+
+def load_testbenches(problems_data):
+    """
+    Maps module names to their testbenches.
+    """
     module_testbenches = {}
     for category, problems in problems_data.items():
         for problem in problems:
@@ -55,77 +93,54 @@ def run_functional_correctness():
             testbench_code = problem.get("Testbench")
             if module_name and testbench_code:
                 module_testbenches[module_name] = testbench_code
+    return module_testbenches
+
+def get_vivado_path():
+    """
+    Returns the Vivado executable path from the "vivado" environment variable.
+    """
+    vivado_path = os.environ.get("vivado")
+    if not vivado_path:
+        raise EnvironmentError("Vivado environment variable not set.")
+    return os.path.join(vivado_path, "vivado.bat")
+
+def run_functional_correctness(solutions_file=SOLUTIONS_FILE, model=None, category=None):
+    # Load only the slice of solutions this run processes
+    solutions_data = solutions_store.load_solutions(solutions_file, model, category)
+
+    with open(PROBLEMS_FILE, "r", encoding="utf-8") as file:
+        problems_data = json.load(file)
+
+    # Map module names to their testbenches
+    module_testbenches = load_testbenches(problems_data)
 
     # print(module_testbenches.keys())
 
 
 
     # Get Vivado path from environment variable
-    vivado_path = os.environ.get("vivado")
-    if not vivado_path:
-        raise EnvironmentError("Vivado environment variable not set.")
-    vivado_path = os.path.join(vivado_path, "vivado.bat")
+    vivado_path = get_vivado_path()
 
     # Iterate over solutions and test them
-    for model, categories in solutions_data.items():
-        for category, modules in categories.items():
-            for module_entry in modules:
-                module_name = module_entry["module"]
-                # print(module_name)
-                # print(module_name in module_testbenches.keys())
-
-                if module_name not in module_testbenches:
-                    print(f"Skipping {module_name}: No testbench found.")
-                    continue
-
-
-                testbench_code = module_testbenches[module_name]
-                solutions = module_entry["solutions"]
-
-                # Iterate over all solutions
-                for solution_entry in solutions:
-                    verilog_code = solution_entry["solution"]
-
-                    # Write the Verilog design to a file
-                    with open(TEMP_VERILOG_FILE, "w", encoding="utf-8") as f:
-                        f.write(verilog_code)
-
-                    # Write the testbench to a file
-                    with open(TEMP_TESTBENCH_FILE, "w", encoding="utf-8") as f:
-                        f.write(testbench_code)
-
-                    # Extract the top module name
-                    top_module = extract_top_module_name(TEMP_TESTBENCH_FILE)
-                    if not top_module:
-                        print(f"Error: Could not extract top module from {module_name}. Skipping...")
-                        solution_entry["pass"] = "Error: Could not extract top module."
-                        continue
-
-                    print(f"Testing module: {module_name} (Top Module: {top_module})")
-
-                    write_tcl()
-
-                    # Run Vivado in batch mode
-                    print(f"Running Vivado simulation for {module_name}...")
-                    process = subprocess.run([vivado_path, "-mode", "batch", "-source", TCL_SCRIPT_FILE], capture_output=True, text=True)
-
-                    # Capture output logs
-                    output_log = process.stdout + "\n" + process.stderr
-                    print(output_log)
-                    test_passed = "All tests passed" in output_log
-
-                    # Determine pass/fail status
-                    if test_passed:
-                        solution_entry["pass"] = "true"
-                    else:
-                        # Extract relevant error messages
-                        error_lines = "\n".join(line for line in output_log.split("\n") if "error" or "fail" in line.lower())
-                        solution_entry["pass"] = error_lines if error_lines else "Test failed somehow"
-
-                    print(f"Test result for {module_name}: {'PASS' if test_passed else 'FAIL'}")
-
-                    # Save results after testing each module
-                    with open(SOLUTIONS_FILE, "w", encoding="utf-8") as file:
-                        json.dump(solutions_data, file, indent=4)
+    for model_name, category_name, modules in solutions_store.iter_slices(solutions_data, model, category):
+        for module_entry in modules:
+            module_name = module_entry["module"]
+            # print(module_name)
+            # print(module_name in module_testbenches.keys())
+
+            if module_name not in module_testbenches:
+                print(f"Skipping {module_name}: No testbench found.")
+                continue
+
+
+            testbench_code = module_testbenches[module_name]
+            solutions = module_entry["solutions"]
+
+            # Iterate over all solutions
+            for solution_entry in solutions:
+                solution_entry["pass"] = test_solution(solution_entry["solution"], testbench_code, module_name, vivado_path)
+
+                # Save results after testing each module
+                solutions_store.save_solutions(solutions_file, solutions_data, model_name, category_name)
 
     print("All tests completed.")
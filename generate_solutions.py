@@ -1,7 +1,10 @@
 import json
-import os
+import math
 import re
 from openai import OpenAI
+from functional_correctness import get_vivado_path, load_testbenches, test_solution
+from resource_usage import run_synthesis
+import solutions_store
 
 def load_prompt_data(filepath: str) -> dict:
     """
@@ -10,21 +13,21 @@ def load_prompt_data(filepath: str) -> dict:
     with open(filepath, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def load_solutions(filepath: str) -> dict:
+def load_solutions(filepath: str, model_name: str = None) -> dict:
     """
-    Loads the existing solutions JSON, or returns a default if file not found.
+    Loads the existing solutions JSON (or only one model's shards from a solutions store),
+    or returns a default if file not found.
     """
-    if os.path.exists(filepath):
-        with open(filepath, "r", encoding="utf-8") as f:
-            return json.load(f)
+    if solutions_store.exists(filepath):
+        return solutions_store.load_solutions(filepath, model_name)
     return {}
 
-def save_solutions(filepath: str, solutions: dict):
+def save_solutions(filepath: str, solutions: dict, model_name: str = None, category: str = None):
     """
-    Saves the solutions dictionary to the solutions.json file (pretty-printed).
+    Saves the solutions dictionary to the solutions.json file (pretty-printed),
+    or rewrites only the given model/category shard of a solutions store.
     """
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(solutions, f, indent=4)
+    solutions_store.save_solutions(filepath, solutions, model_name, category)
 
 def call_LLMs(client, model: str, problem: str, module_header: str) -> str:
     """
@@ -63,6 +66,98 @@ def call_LLMs(client, model: str, problem: str, module_header: str) -> str:
         print("Error:", str(e))
         return json.dumps({"solution": f"Error: {str(e)}"})
 
+def generate_solution(client, model: str, item: dict) -> str:
+    """
+    Asks the LLM for one solution to a problem and extracts the Verilog code from its JSON reply.
+    """
+    problem_statement = item.get("Problem", "")
+    module_header = item.get("Module header", "")
+    
+    response_json_str = call_LLMs(client, model, problem_statement, module_header)
+    response_json_str = response_json_str.strip('`').replace('json', '').replace('```', '')
+    
+    try:
+        response_json = json.loads(response_json_str)
+        return response_json.get("solution", "")
+    except json.JSONDecodeError:
+        print(response_json_str)
+        return "Error: Invalid JSON response"
+
+def get_module_entry(category_list: list, module_name: str) -> dict:
+    """
+    Returns the entry for a module in a category list, appending an empty one if it does not exist yet.
+    """
+    module_entry = next((entry for entry in category_list if entry.get("module") == module_name), None)
+    
+    if module_entry is None:
+        module_entry = {"module": module_name, "solutions": []}
+        category_list.append(module_entry)
+    return module_entry
+
+def wilson_interval(passes: int, n: int, z: float = 1.96) -> tuple:
+    """
+    Returns the Wilson score confidence interval (lower, upper) for a pass rate of passes / n.
+    """
+    if n == 0:
+        return 0.0, 1.0
+    p = passes / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+def interval_width(state: dict) -> float:
+    """
+    Returns the width of the pass-rate confidence interval of an adaptive sampling state.
+    """
+    lower, upper = wilson_interval(state["passes"], len(state["samples"]))
+    return upper - lower
+
+def record_sample(state: dict, position: int):
+    """
+    Adds the evaluated sample at the given position of the module's "solutions" list
+    to an adaptive sampling state.
+    """
+    solution_entry = state["entry"]["solutions"][position]
+    state["samples"].append(position)
+    if solution_entry.get("pass", "").strip().lower() == "true":
+        state["passes"] += 1
+        lut_count = solution_entry.get("resource usage", {}).get("optimized", {}).get("LUT")
+        if lut_count is not None and (state["min_lut"] is None or lut_count < state["min_lut"]):
+            state["min_lut"] = lut_count
+            state["stable"] = 0
+        else:
+            state["stable"] += 1
+
+def check_stop(state: dict, ci_width: float, lut_patience: int, min_samples: int, max_samples: int):
+    """
+    Applies the stopping rules of adaptive sampling to a state.
+    """
+    if state["stop"] is not None:
+        return
+    n = len(state["samples"])
+    if n >= min_samples and interval_width(state) <= ci_width:
+        state["stop"] = "confidence interval"
+    elif state["min_lut"] is not None and state["stable"] >= lut_patience:
+        state["stop"] = "LUT stable"
+    elif n >= max_samples:
+        state["stop"] = "max samples"
+
+def update_adaptive_record(state: dict, k: int):
+    """
+    Writes the "adaptive" record of a module entry from its sampling state.
+    "samples" holds the positions of the drawn samples in "solutions"; "skipped" holds the slots
+    of the k-sample budget that were not drawn. "stop" stays None while the module is still sampled.
+    """
+    drawn = len(state["samples"])
+    state["entry"]["adaptive"] = {
+        "k": k,
+        "drawn": drawn,
+        "samples": list(state["samples"]),
+        "skipped": list(range(drawn, k)),
+        "stop": state["stop"],
+    }
+
 def generate_solutions(api_key: str, model_name: str, k: int, prompt_json_file: str = "problems.json", solutions_json_file: str = "solutions.json"):
     """
     Generates Verilog solutions for problems using an LLM.
@@ -74,7 +169,7 @@ def generate_solutions(api_key: str, model_name: str, k: int, prompt_json_file:
     prompt_data = load_prompt_data(prompt_json_file)
     
     # Load or initialize solutions data
-    solutions_data = load_solutions(solutions_json_file)
+    solutions_data = load_solutions(solutions_json_file, model_name)
 
     if model_name not in solutions_data:
         solutions_data[model_name] = {}
@@ -85,27 +180,103 @@ def generate_solutions(api_key: str, model_name: str, k: int, prompt_json_file:
                 solutions_data[model_name][category] = []
             
             for item in problems:
-                problem_statement = item.get("Problem", "")
-                module_header = item.get("Module header", "")
                 module_name = item.get("module")
-                
-                response_json_str = call_LLMs(client, model_name, problem_statement, module_header)
-                response_json_str = response_json_str.strip('`').replace('json', '').replace('```', '')
-                
-                try:
-                    response_json = json.loads(response_json_str)
-                    verilog_code = response_json.get("solution", "")
-                except json.JSONDecodeError:
-                    print(response_json_str)
-                    verilog_code = "Error: Invalid JSON response"
+                verilog_code = generate_solution(client, model_name, item)
                 
                 print(f"Processing module: {module_name}")
-                category_list = solutions_data[model_name][category]
-                module_entry = next((entry for entry in category_list if entry.get("module") == module_name), None)
-                
-                if module_entry is None:
-                    module_entry = {"module": module_name, "solutions": []}
-                    category_list.append(module_entry)
-                
+                module_entry = get_module_entry(solutions_data[model_name][category], module_name)
                 module_entry["solutions"].append({"solution": verilog_code, "pass": ""})
-                save_solutions(solutions_json_file, solutions_data)
+                save_solutions(solutions_json_file, solutions_data, model_name, category)
+
+def generate_solutions_adaptive(api_key: str, model_name: str, k: int, ci_width: float = 0.3, lut_patience: int = 3, min_samples: int = 2, max_samples: int = None, prompt_json_file: str = "problems.json", solutions_json_file: str = "solutions.json"):
+    """
+    Generates Verilog solutions with an adaptive number of samples per problem.
+    The total budget is k samples per problem. Each sample is simulated and, if it passes,
+    synthesized right away. A problem stops drawing samples once the width of its pass-rate
+    confidence interval is at most ci_width, or once its minimum LUT count has not improved
+    over lut_patience passing samples. The remaining budget goes to the problems with the
+    widest confidence interval, up to max_samples (default 2 * k) per problem.
+    Each module entry gets an "adaptive" record, saved after every sample, with the positions of
+    the drawn samples in its "solutions" list and the slots of the k samples that were skipped,
+    so pass@k can be estimated from what was drawn. A re-run with the same k continues from the
+    existing records: samples already drawn count against the budget, so a finished run draws
+    nothing new and an interrupted one only spends what is left. A different k raises ValueError.
+    """
+    # Initialize OpenAI client
+    client = OpenAI(api_key=api_key)
+    
+    # Load the problem data
+    prompt_data = load_prompt_data(prompt_json_file)
+    module_testbenches = load_testbenches(prompt_data)
+    vivado_path = get_vivado_path()
+    
+    # Load or initialize solutions data
+    solutions_data = load_solutions(solutions_json_file, model_name)
+
+    if model_name not in solutions_data:
+        solutions_data[model_name] = {}
+
+    if max_samples is None:
+        max_samples = 2 * k
+
+    # Per-problem sampling state
+    states = []
+    for category, problems in prompt_data.items():
+        if category not in solutions_data[model_name]:
+            solutions_data[model_name][category] = []
+        
+        for item in problems:
+            module_entry = get_module_entry(solutions_data[model_name][category], item.get("module"))
+            state = {"category": category, "item": item, "entry": module_entry, "samples": [], "passes": 0, "min_lut": None, "stable": 0, "stop": None}
+            # Continue from the samples of a previous adaptive run
+            record = module_entry.get("adaptive")
+            if record is not None:
+                if record["k"] != k:
+                    raise ValueError(f"{model_name}/{item.get('module')} was sampled adaptively with k={record['k']}, not k={k}.")
+                for position in record["samples"]:
+                    record_sample(state, position)
+                state["stop"] = record["stop"]
+            check_stop(state, ci_width, lut_patience, min_samples, max_samples)
+            states.append(state)
+
+    # Samples drawn by earlier runs count against the budget
+    budget = k * len(states) - sum(len(state["samples"]) for state in states)
+    while budget > 0:
+        open_states = [state for state in states if state["stop"] is None]
+        if not open_states:
+            break
+        
+        # Spend the next sample on the most uncertain problem
+        state = max(open_states, key=lambda state: (interval_width(state), -len(state["samples"])))
+        module_name = state["item"].get("module")
+        
+        if module_name not in module_testbenches:
+            print(f"Skipping {module_name}: No testbench found.")
+            state["stop"] = "no testbench"
+            continue
+        
+        print(f"Processing module: {module_name} (sample {len(state['samples']) + 1})")
+        verilog_code = generate_solution(client, model_name, state["item"])
+        pass_value = test_solution(verilog_code, module_testbenches[module_name], module_name, vivado_path)
+        
+        resource_usage = None
+        if pass_value == "true":
+            resource_usage = run_synthesis(verilog_code)
+        if not resource_usage:
+            resource_usage = {"optimized": {}, "primitives": {}}
+        
+        state["entry"]["solutions"].append({"solution": verilog_code, "pass": pass_value, "resource usage": resource_usage})
+        record_sample(state, len(state["entry"]["solutions"]) - 1)
+        budget -= 1
+        
+        check_stop(state, ci_width, lut_patience, min_samples, max_samples)
+        
+        # Keep the record in step with the samples so an interrupted run is still estimated correctly
+        update_adaptive_record(state, k)
+        save_solutions(solutions_json_file, solutions_data, model_name, state["category"])
+
+    for state in states:
+        if state["stop"] is None:
+            state["stop"] = "budget"
+        update_adaptive_record(state, k)
+    save_solutions(solutions_json_file, solutions_data, model_name)
@@ -1,7 +1,7 @@
-import json
 import subprocess
 import os
 import re
+import solutions_store
 
 def extract_module_name(verilog_code):
     """
@@ -158,37 +158,25 @@ def run_synthesis(solution_code):
         print("Synthesis did not complete successfully.")
         return None
 
-def run_resource_usage():
-    # Load the original JSON.
-    input_json_file = "solutions.json"  # Update this file name if needed.
-    with open(input_json_file, "r") as f:
-        data = json.load(f)
-
-    # Traverse all top-level keys (e.g., "4o") and all subcategories.
-    for top_key, top_value in data.items():
-        # print(top_value.keys())
-        # exit()
-        # top_value should be a dict with categories (e.g., "Combinational Logic", "Finite State Machines", etc.)
-        for category, module_list in top_value.items():
-            # if category == "Combinational Logic":
-            #     continue
-            for module in module_list:
-                for sol in module["solutions"]:
-                    if sol.get("pass", "").strip().lower() == "true":
-                        solution_code = sol["solution"]
-                        print(f"Running synthesis for module '{module['module']}' in category '{category}'")
-                        resource_usage = run_synthesis(solution_code)
-                        if resource_usage:
-                            sol["resource usage"] = resource_usage
-                        else:
-                            sol["resource usage"] = {"optimized": {}, "primitives": {}}
+def run_resource_usage(solutions_file="solutions.json", model=None, category=None):
+    # Load the original JSON, or only the requested slice of a solutions store.
+    data = solutions_store.load_solutions(solutions_file, model, category)
+
+    # Traverse all models (e.g., "4o") and their categories (e.g., "Combinational Logic", "Finite State Machines", etc.)
+    for model_name, category_name, module_list in solutions_store.iter_slices(data, model, category):
+        for module in module_list:
+            for sol in module["solutions"]:
+                if sol.get("pass", "").strip().lower() == "true":
+                    solution_code = sol["solution"]
+                    print(f"Running synthesis for module '{module['module']}' in category '{category_name}'")
+                    resource_usage = run_synthesis(solution_code)
+                    if resource_usage:
+                        sol["resource usage"] = resource_usage
                     else:
                         sol["resource usage"] = {"optimized": {}, "primitives": {}}
+                else:
+                    sol["resource usage"] = {"optimized": {}, "primitives": {}}
 
-                    # Write the updated JSON (with resource usage added) to a new file.
-                    output_json_file = "solutions.json"
-                    with open(output_json_file, "w") as f:
-                        json.dump(data, f, indent=4)
-                    print(f"Updated JSON written to {output_json_file}")
-
-
+                # Write the updated solutions (with resource usage added) back; for a store only this shard is rewritten.
+                solutions_store.save_solutions(solutions_file, data, model_name, category_name)
+                print(f"Updated solutions written to {solutions_file}")
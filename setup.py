@@ -1,42 +1,58 @@
 import argparse
 import subprocess
-from generate_solutions import generate_solutions
-from functional_correctness import run_functional_correctness, run_resource_usage
+from generate_solutions import generate_solutions, generate_solutions_adaptive
+from functional_correctness import run_functional_correctness
+from resource_usage import run_resource_usage
 
 def main():
     parser = argparse.ArgumentParser(description="Command-line interface for Verilog solution generation and evaluation.")
     
     parser.add_argument("-generate_solutions", nargs=3, metavar=("MODEL_NAME", "K", "API_KEY"), help="Generate Verilog solutions using the specified model, number of iterations, and API key.")
+    parser.add_argument("-adaptive", action="store_true", help="Allocate samples per problem adaptively and evaluate them during generation.")
+    parser.add_argument("-solutions", default="solutions.json", metavar="PATH", help="Solutions file, or a solutions store directory (any path not ending in .json).")
     parser.add_argument("-functional_correctness", action="store_true", help="Run functional correctness evaluation.")
     parser.add_argument("-resource_usage", action="store_true", help="Run resource usage evaluation.")
     
     args = parser.parse_args()
+    if args.adaptive and not args.generate_solutions:
+        parser.error("-adaptive requires -generate_solutions")
     
-    if args.generate_solutions:
+    if args.generate_solutions and args.adaptive:
         model_name, k, api_key = args.generate_solutions
-        generate_solutions(api_key, model_name, int(k))
+        # Samples are already simulated and synthesized during adaptive generation
+        generate_solutions_adaptive(api_key, model_name, int(k), solutions_json_file=args.solutions)
         
         if args.functional_correctness:
-            run_functional_correctness()
-            subprocess.run(["python", "./evaluate/count_pass.py"])
-            subprocess.run(["python", "./evaluate/plot_pass.py"])
+            subprocess.run(["python", "./evaluate/count_pass.py", args.solutions])
+            subprocess.run(["python", "./evaluate/plot_pass.py", args.solutions])
+        
+        if args.resource_usage:
+            subprocess.run(["python", "./evaluate/count_resource.py", args.solutions])
+    elif args.generate_solutions:
+        model_name, k, api_key = args.generate_solutions
+        generate_solutions(api_key, model_name, int(k), solutions_json_file=args.solutions)
+        
+        if args.functional_correctness:
+            run_functional_correctness(args.solutions)
+            subprocess.run(["python", "./evaluate/count_pass.py", args.solutions])
+            subprocess.run(["python", "./evaluate/plot_pass.py", args.solutions])
         
             if args.resource_usage:
-                run_resource_usage()
-                subprocess.run(["python", "./evaluate/count_resource.py"])
+                run_resource_usage(args.solutions)
+                subprocess.run(["python", "./evaluate/count_resource.py", args.solutions])
     else:
         if args.functional_correctness:
-            run_functional_correctness()
-            subprocess.run(["python", "./evaluate/count_pass.py"])
-            subprocess.run(["python", "./evaluate/plot_pass.py"])
+            run_functional_correctness(args.solutions)
+            subprocess.run(["python", "./evaluate/count_pass.py", args.solutions])
+            subprocess.run(["python", "./evaluate/plot_pass.py", args.solutions])
             
             if args.resource_usage:
-                run_resource_usage()
-                subprocess.run(["python", "./evaluate/count_resource.py"])
+                run_resource_usage(args.solutions)
+                subprocess.run(["python", "./evaluate/count_resource.py", args.solutions])
         
         if args.resource_usage:
-            run_resource_usage()
-            subprocess.run(["python", "./evaluate/count_resource.py"])
+            run_resource_usage(args.solutions)
+            subprocess.run(["python", "./evaluate/count_resource.py", args.solutions])
     
 if __name__ == "__main__":
     main()
@@ -0,0 +1,333 @@
+import argparse
+import json
+import mmap
+import os
+import re
+import time
+
+# Layout of a solutions store directory:
+#   index.json                          {"models": [...], "shards": [{"model", "category", "path"}, ...]} in insertion order
+#   <path>.index.json                   {"model", "category", "generation", "data", "modules"}: module entries whose
+#                                       "solutions" list holds the (offset, length) of each sample record in "data"
+#   <path>.<generation>.jsonl           one JSON record per sample: {"module", "sample", "entry"}
+# The real model and category names are kept only in the index files; <path> is derived from them
+# and made unique (ignoring case), so names that map to the same file name do not share a shard.
+INDEX_FILE = "index.json"
+LOCK_FILE = "index.lock"
+LOCK_TIMEOUT = 60
+
+def is_store(path: str) -> bool:
+    """
+    An existing directory is a store; otherwise a path ending in .json (any case) is a single
+    solutions file and anything else is a store directory.
+    """
+    return os.path.isdir(path) or not path.lower().endswith(".json")
+
+def exists(path: str) -> bool:
+    """
+    Returns whether a solutions file or a store (with its index) exists at path.
+    """
+    if is_store(path):
+        return os.path.exists(os.path.join(path, INDEX_FILE))
+    return os.path.exists(path)
+
+def safe_name(name: str) -> str:
+    """
+    Turns a model or category name into a file name.
+    """
+    return re.sub(r"[^\w.-]", "_", name)
+
+def load_index(root: str, create: bool = False) -> dict:
+    """
+    Loads the shard list of a store. Raises FileNotFoundError if the store has no index,
+    unless create is set, in which case an empty index is returned.
+    """
+    index_file = os.path.join(root, INDEX_FILE)
+    if os.path.exists(index_file):
+        with open(index_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    if create:
+        return {"models": [], "shards": []}
+    raise FileNotFoundError(f"No solutions store index found at {index_file}")
+
+def write_json_atomic(filepath: str, data):
+    """
+    Writes JSON to a temporary file and moves it into place, so readers never see a partial file.
+    """
+    tmp_file = f"{filepath}.{os.getpid()}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_file, filepath)
+
+def lock_index(root: str) -> str:
+    """
+    Takes the store's index lock (an exclusively created lock file) and returns its path.
+    """
+    lock_file = os.path.join(root, LOCK_FILE)
+    deadline = time.time() + LOCK_TIMEOUT
+    while True:
+        try:
+            os.close(os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return lock_file
+        except FileExistsError:
+            if time.time() > deadline:
+                raise TimeoutError(f"Could not lock {lock_file}; remove it if no other process is writing the store.")
+            time.sleep(0.05)
+
+def find_shard(index: dict, model: str, category: str) -> dict:
+    """
+    Returns the descriptor of a (model, category) shard in a loaded index, or None.
+    """
+    return next((s for s in index["shards"] if s["model"] == model and s["category"] == category), None)
+
+def update_index(root: str, model: str, category: str = None) -> dict:
+    """
+    Registers a model (and a (model, category) shard) in the store index if it is not there yet.
+    The index is only changed under the store lock, so concurrent workers do not drop each other's entries.
+    Returns the shard descriptor, or None when no category is given.
+    """
+    index = load_index(root, create=True)
+    shard = find_shard(index, model, category) if category is not None else None
+    if model in index["models"] and (category is None or shard is not None):
+        return shard
+
+    os.makedirs(root, exist_ok=True)
+    lock_file = lock_index(root)
+    try:
+        # Reload under the lock in case another worker changed the index meanwhile
+        index = load_index(root, create=True)
+        if model not in index["models"]:
+            index["models"].append(model)
+        shard = None
+        if category is not None:
+            shard = find_shard(index, model, category)
+            if shard is None:
+                taken = {s["path"].lower() for s in index["shards"]}
+                base = f"{safe_name(model)}/{safe_name(category)}"
+                path = base
+                suffix = 2
+                while path.lower() in taken:
+                    path = f"{base}_{suffix}"
+                    suffix += 1
+                shard = {"model": model, "category": category, "path": path}
+                index["shards"].append(shard)
+                os.makedirs(os.path.dirname(os.path.join(root, path)), exist_ok=True)
+        write_json_atomic(os.path.join(root, INDEX_FILE), index)
+    finally:
+        os.remove(lock_file)
+    return shard
+
+def list_shards(root: str, model: str = None, category: str = None) -> list:
+    """
+    Returns the shard descriptors of a store, optionally restricted to one model and/or category.
+    """
+    return [shard for shard in load_index(root)["shards"]
+            if (model is None or shard["model"] == model) and (category is None or shard["category"] == category)]
+
+def list_models(root: str) -> list:
+    """
+    Returns the model names in a store, in the order they were added.
+    """
+    return load_index(root)["models"]
+
+def load_shard_index(root: str, shard: dict) -> dict:
+    """
+    Loads the per-shard index: the current data file, module metadata and sample offsets.
+    """
+    shard_index_file = os.path.join(root, shard["path"] + ".index.json")
+    if not os.path.exists(shard_index_file):
+        # Registered but not written yet
+        return {"model": shard["model"], "category": shard["category"], "generation": 0, "data": None, "modules": []}
+    with open(shard_index_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def write_shard(root: str, model: str, category: str, modules: list):
+    """
+    Writes one (model, category) shard and its index, replacing any previous version.
+    modules is a category list in the single-file format.
+    The records go to a new generation file and the shard index is switched to it atomically,
+    so a reader always sees an index that matches its data.
+    """
+    shard = update_index(root, model, category)
+    previous = load_shard_index(root, shard)
+    generation = previous["generation"] + 1
+    data_file = f"{os.path.basename(shard['path'])}.{generation}.jsonl"
+    shard_dir = os.path.dirname(os.path.join(root, shard["path"]))
+    shard_index = {"model": model, "category": category, "generation": generation, "data": data_file, "modules": []}
+    offset = 0
+    with open(os.path.join(shard_dir, data_file), "wb") as f:
+        for module_entry in modules:
+            meta = dict(module_entry)
+            meta["solutions"] = []
+            for sample, solution_entry in enumerate(module_entry.get("solutions", [])):
+                record = {"module": module_entry.get("module"), "sample": sample, "entry": solution_entry}
+                line = json.dumps(record).encode("utf-8") + b"\n"
+                f.write(line)
+                meta["solutions"].append([offset, len(line)])
+                offset += len(line)
+            shard_index["modules"].append(meta)
+    write_json_atomic(os.path.join(root, shard["path"] + ".index.json"), shard_index)
+
+    # Keep the previous generation for readers that loaded the old index; remove older ones
+    if generation > 2:
+        try:
+            os.remove(os.path.join(shard_dir, f"{os.path.basename(shard['path'])}.{generation - 2}.jsonl"))
+        except OSError:
+            pass
+
+def shard_data_path(root: str, shard: dict, shard_index: dict) -> str:
+    """
+    Returns the path of the data file that a shard index points to.
+    """
+    return os.path.join(os.path.dirname(os.path.join(root, shard["path"])), shard_index["data"])
+
+def read_shard(root: str, shard: dict) -> list:
+    """
+    Reads one shard back into a category list in the single-file format,
+    using the record offsets of the shard index.
+    """
+    shard_index = load_shard_index(root, shard)
+    modules = []
+    if shard_index["data"] is None:
+        return modules
+    with open(shard_data_path(root, shard, shard_index), "rb") as f:
+        for meta in shard_index["modules"]:
+            module_entry = dict(meta)
+            module_entry["solutions"] = []
+            for offset, length in meta["solutions"]:
+                f.seek(offset)
+                module_entry["solutions"].append(json.loads(f.read(length))["entry"])
+            modules.append(module_entry)
+    return modules
+
+def iter_shard_records(root: str, shard: dict):
+    """
+    Streams the sample records of one shard, one line at a time.
+    """
+    shard_index = load_shard_index(root, shard)
+    if shard_index["data"] is None:
+        return
+    with open(shard_data_path(root, shard, shard_index), "rb") as f:
+        for line in f:
+            yield json.loads(line)
+
+def iter_records(root: str, model: str = None, category: str = None):
+    """
+    Streams every sample record of a store (optionally one model and/or category) as
+    {"model", "category", "module", "sample", "entry"} without loading whole shards.
+    """
+    for shard in list_shards(root, model, category):
+        for record in iter_shard_records(root, shard):
+            record["model"] = shard["model"]
+            record["category"] = shard["category"]
+            yield record
+
+def iter_file_records(json_file: str, model: str = None, category: str = None):
+    """
+    Yields the same records as iter_records from a single solutions file.
+    """
+    with open(json_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    for model_name, category_name, modules in iter_slices(data, model, category):
+        for module_entry in modules:
+            for sample, solution_entry in enumerate(module_entry.get("solutions", [])):
+                yield {"model": model_name, "category": category_name, "module": module_entry.get("module"),
+                       "sample": sample, "entry": solution_entry}
+
+def read_solution(root: str, model: str, category: str, module: str, sample: int) -> dict:
+    """
+    Looks up a single solution entry through the shard index and reads it from a memory-mapped shard.
+    Raises KeyError naming the model, category, module or sample that is not in the store.
+    """
+    shards = list_shards(root, model, category)
+    if not shards:
+        raise KeyError(f"No shard for model {model!r}, category {category!r} in solutions store {root}")
+    shard = shards[0]
+    shard_index = load_shard_index(root, shard)
+    if shard_index["data"] is None:
+        raise KeyError(f"Shard for model {model!r}, category {category!r} in solutions store {root} has no data yet")
+    meta = next((meta for meta in shard_index["modules"] if meta.get("module") == module), None)
+    if meta is None:
+        raise KeyError(f"No module {module!r} for model {model!r}, category {category!r} in solutions store {root}")
+    if not 0 <= sample < len(meta["solutions"]):
+        raise KeyError(f"No sample {sample} of module {module!r} for model {model!r}, category {category!r} in solutions store {root}")
+    offset, length = meta["solutions"][sample]
+    with open(shard_data_path(root, shard, shard_index), "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return json.loads(mm[offset:offset + length])["entry"]
+
+def iter_slices(data: dict, model: str = None, category: str = None):
+    """
+    Yields (model, category, modules) for every slice of solutions data in the single-file format,
+    optionally restricted to one model and/or category.
+    """
+    for model_name, categories in data.items():
+        if model is not None and model_name != model:
+            continue
+        for category_name, modules in categories.items():
+            if category is None or category_name == category:
+                yield model_name, category_name, modules
+
+def load_solutions(path: str, model: str = None, category: str = None) -> dict:
+    """
+    Loads solutions in the single-file format from either a solutions file or a store.
+    For a store, only the shards of the given model and/or category are read; a solutions
+    file is always loaded whole, so use iter_slices to restrict what is processed.
+    """
+    if not is_store(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    data = {}
+    if category is None:
+        data = {model_name: {} for model_name in list_models(path) if model is None or model_name == model}
+    for shard in list_shards(path, model, category):
+        data.setdefault(shard["model"], {})[shard["category"]] = read_shard(path, shard)
+    return data
+
+def save_solutions(path: str, data: dict, model: str = None, category: str = None):
+    """
+    Saves solutions in the single-file format to either a solutions file or a store.
+    For a store, only the shards of the given model and/or category are rewritten;
+    a solutions file is always rewritten whole.
+    """
+    if not is_store(path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+        return
+
+    for model_name in data:
+        if model is None or model_name == model:
+            update_index(path, model_name)
+    for model_name, category_name, modules in iter_slices(data, model, category):
+        write_shard(path, model_name, category_name, modules)
+
+def import_solutions(json_file: str, root: str):
+    """
+    Converts a single solutions file into a store.
+    """
+    with open(json_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    save_solutions(root, data)
+
+def export_solutions(root: str, json_file: str):
+    """
+    Converts a store back into a single solutions file.
+    """
+    save_solutions(json_file, load_solutions(root))
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert between solutions.json and a sharded solutions store.")
+
+    parser.add_argument("-import_solutions", nargs=2, metavar=("JSON_FILE", "STORE_DIR"), help="Import a single solutions file into a store.")
+    parser.add_argument("-export_solutions", nargs=2, metavar=("STORE_DIR", "JSON_FILE"), help="Export a store to a single solutions file.")
+
+    args = parser.parse_args()
+
+    if args.import_solutions:
+        import_solutions(*args.import_solutions)
+    if args.export_solutions:
+        export_solutions(*args.export_solutions)
+
+if __name__ == "__main__":
+    main()